@@ -1,7 +1,18 @@
 """ViiV Basic Test"""
+import copy
 import unittest
+from unittest import mock
 
-from viiv.viiv import normalize_range
+from viiv import viiv
+from viiv.viiv import (
+    ColorComponent,
+    Config,
+    GroupMatcher,
+    MatchRule,
+    TemplateConfig,
+    _to_int,
+    normalize_range,
+)
 
 
 class TestRandomRange(unittest.TestCase):
@@ -25,6 +36,263 @@ class TestRandomRange(unittest.TestCase):
         result = normalize_range(["10", "10"])
         self.assertEqual(result, [])
 
+    def test_random_range_hex_values(self):
+        """Random range with hex values"""
+        result = normalize_range(["0x08", "0x0b"])
+        self.assertEqual(result, ["08", "09", "10"])
+
+
+class TestToInt(unittest.TestCase):
+    """Test cases for int conversion"""
+
+    def test_to_int_hex_string(self):
+        """Hex string is converted with base 16"""
+        self.assertEqual(_to_int("0x99"), 153)
+        self.assertEqual(_to_int("0XcC"), 204)
+
+    def test_to_int_decimal_string_and_int(self):
+        """Decimal string and int are converted as is"""
+        self.assertEqual(_to_int("12"), 12)
+        self.assertEqual(_to_int(7), 7)
+
+
+class TestReplaceColorComponents(unittest.TestCase):
+    """Test cases for replacing color components"""
+
+    def test_replace_placeholder_color_components(self):
+        """Each selected component is taken from the new color"""
+        replace = TemplateConfig.replace_color_components
+        basic, light, alpha = (
+            ColorComponent.BASIC,
+            ColorComponent.LIGHT,
+            ColorComponent.ALPHA,
+        )
+        self.assertEqual(replace("C_11_2233", "C_44_5566", [basic]), "C_44_2233")
+        self.assertEqual(replace("C_11_2233", "C_44_5566", [light]), "C_11_5533")
+        self.assertEqual(replace("C_11_2233", "C_44_5566", [alpha]), "C_11_2266")
+        self.assertEqual(
+            replace("C_11_2233", "C_44_5566", [basic, light, alpha]), "C_44_5566"
+        )
+
+    def test_replace_alpha_appended_or_removed(self):
+        """Alpha is appended if missing and removed if the new color has none"""
+        replace = TemplateConfig.replace_color_components
+        self.assertEqual(
+            replace("C_11_22", "C_44_5566", [ColorComponent.ALPHA]), "C_11_2266"
+        )
+        self.assertEqual(
+            replace("C_11_2233", "C_44_55", [ColorComponent.ALPHA]), "C_11_22"
+        )
+
+    def test_replace_hex_color_components(self):
+        """Only alpha can be replaced in RGB HEX color"""
+        replace = TemplateConfig.replace_color_components
+        components = [ColorComponent.BASIC, ColorComponent.LIGHT]
+        self.assertEqual(replace("#123456", "C_44_5566", components), "#123456")
+        self.assertEqual(
+            replace("#12345678", "#abcdef99", components + [ColorComponent.ALPHA]),
+            "#12345699",
+        )
+
+
+TARGET_PROPERTY = "panel.title.border"
+
+# one color config per match rule, from the lowest to the highest priority
+FUZZY_CONFIG = {"groups": ["p.*l"], "color": {"hex": "#000005"}}
+CONTAINS_CONFIG = {"groups": ["title"], "color": {"hex": "#000004"}}
+STARTSWITH_CONFIG = {"groups": ["panel"], "color": {"hex": "#000003"}}
+ENDSWITH_CONFIG = {"groups": ["border"], "color": {"hex": "#000002"}}
+EXACT_CONFIG = {"groups": [TARGET_PROPERTY], "color": {"hex": "#000001"}}
+
+
+def _config(areas):
+    """Load the areas, together with the default colors, as config"""
+    areas = copy.deepcopy(areas)
+    areas.setdefault("default", []).append(
+        {"groups": ["default"], "color": {"hex": "#ffffff"}}
+    )
+    areas.setdefault("token", []).append(
+        {"groups": ["token_default"], "color": {"hex": "#eeeeee"}}
+    )
+    config_data = {"options": {}, "themes": [], **areas}
+    with mock.patch("viiv.viiv.load_json_file", return_value=config_data):
+        return Config(config_path="config.json")
+
+
+def _color_wrapper(areas, target_property=TARGET_PROPERTY, target_area=None):
+    """Get the only color wrapper of the property"""
+    color_wrappers = _config(areas).get_color_wrappers(target_property, target_area)
+    assert len(color_wrappers) == 1
+    return color_wrappers[0]
+
+
+class TestColorMatching(unittest.TestCase):
+    """Test cases for finding the color config of a property"""
+
+    def test_higher_priority_match_rule_wins(self):
+        """The color config matched with the highest priority rule wins"""
+        color_configs = [
+            FUZZY_CONFIG,
+            CONTAINS_CONFIG,
+            STARTSWITH_CONFIG,
+            ENDSWITH_CONFIG,
+            EXACT_CONFIG,
+        ]
+        for i in range(1, len(color_configs) + 1):
+            with self.subTest(color_configs=i):
+                wrapper = _color_wrapper({"border": color_configs[:i]})
+                self.assertEqual(wrapper.colors, [color_configs[i - 1]["color"]["hex"]])
+                # the order of the color configs doesn't matter
+                wrapper = _color_wrapper({"border": color_configs[:i][::-1]})
+                self.assertEqual(wrapper.colors, [color_configs[i - 1]["color"]["hex"]])
+
+    def test_same_match_rule_first_color_config_wins(self):
+        """The first color config wins if matched with the same rule"""
+        second_config = {"groups": ["itle"], "color": {"hex": "#000006"}}
+        wrapper = _color_wrapper({"border": [CONTAINS_CONFIG, second_config]})
+        self.assertEqual(wrapper.colors, ["#000004"])
+        wrapper = _color_wrapper({"border": [second_config, CONTAINS_CONFIG]})
+        self.assertEqual(wrapper.colors, ["#000006"])
+
+        second_exact_config = {"groups": [TARGET_PROPERTY], "color": {"hex": "#000006"}}
+        wrapper = _color_wrapper({"border": [EXACT_CONFIG, second_exact_config]})
+        self.assertEqual(wrapper.colors, ["#000001"])
+
+    def test_same_match_rule_groups_in_reverse_order(self):
+        """The groups are tried in reverse sorted order"""
+        color_config = {"groups": ["itle", "title"], "color": {"hex": "#000006"}}
+        wrapper = _color_wrapper({"border": [color_config]})
+        self.assertEqual(wrapper.group, "title")
+
+    def test_higher_priority_match_rule_area_wins(self):
+        """The area matched with the highest priority rule wins, the first if same"""
+        wrapper = _color_wrapper(
+            {"border": [CONTAINS_CONFIG], "editor": [ENDSWITH_CONFIG]}
+        )
+        self.assertEqual((wrapper.area, wrapper.colors), ("editor", ["#000002"]))
+        wrapper = _color_wrapper(
+            {"border": [CONTAINS_CONFIG], "editor": [STARTSWITH_CONFIG]}
+        )
+        self.assertEqual((wrapper.area, wrapper.colors), ("editor", ["#000003"]))
+        wrapper = _color_wrapper({"border": [EXACT_CONFIG], "editor": [EXACT_CONFIG]})
+        self.assertEqual(wrapper.area, "border")
+
+    def test_default_area_wins(self):
+        """The default area wins over any other area if it matches"""
+        areas = {"border": [EXACT_CONFIG], "default": [FUZZY_CONFIG]}
+        wrapper = _color_wrapper(areas)
+        self.assertEqual((wrapper.area, wrapper.colors), ("default", ["#000005"]))
+        self.assertEqual(wrapper.replace_color_component, [ColorComponent.ALPHA])
+        wrapper = _color_wrapper(areas, target_area="border")
+        self.assertEqual((wrapper.area, wrapper.colors), ("border", ["#000001"]))
+        wrapper = _color_wrapper({"border": [FUZZY_CONFIG], "default": []})
+        self.assertEqual((wrapper.area, wrapper.colors), ("border", ["#000005"]))
+
+    def test_property_area_only_matches_its_properties(self):
+        """The background area is skipped for properties without 'background'"""
+        wrapper = _color_wrapper({"background": [EXACT_CONFIG]})
+        self.assertEqual((wrapper.group, wrapper.colors), ("default", ["#ffffff"]))
+
+    def test_no_match_uses_default_color(self):
+        """The default color is used if no color config matched"""
+        wrapper = _color_wrapper({"border": [EXACT_CONFIG]}, "unknown.color")
+        self.assertEqual(wrapper.colors, ["#ffffff"])
+        wrapper = _color_wrapper(
+            {"border": [EXACT_CONFIG]}, "unknown.scope", target_area="token"
+        )
+        self.assertEqual(wrapper.colors, ["#eeeeee"])
+
+    def test_match_rule_cap(self):
+        """Only the match rules with higher priority than the cap are tried"""
+        config = _config({})
+        group_matchers = [GroupMatcher.of("panel")]
+        self.assertEqual(
+            config._match(group_matchers, TARGET_PROPERTY)["match_rule"],
+            MatchRule.STARTSWITH,
+        )
+        self.assertEqual(
+            config._match(
+                group_matchers, TARGET_PROPERTY, match_rule_cap=MatchRule.CONTAINS
+            )["match_rule"],
+            MatchRule.STARTSWITH,
+        )
+        self.assertIsNone(
+            config._match(
+                group_matchers, TARGET_PROPERTY, match_rule_cap=MatchRule.STARTSWITH
+            )
+        )
+
+
+class TestMain(unittest.TestCase):
+    """Test cases for dispatching the command line options"""
+
+    def _main(self, *args, **options):
+        """Run main with the args and options, return the calls of the actions"""
+        actions = mock.Mock()
+        config_options = {
+            k: v for k, v in viiv.config.options.items() if k != "theme_name"
+        }
+        config_options.update(options)
+        with mock.patch.object(viiv.sys, "argv", ["viiv.py", *args]), mock.patch.object(
+            viiv.config, "options", config_options
+        ), mock.patch.multiple(
+            viiv,
+            generate_random_theme=actions.generate_random_theme,
+            generate_themes=actions.generate_themes,
+            print_palette=actions.print_palette,
+            print_colors=actions.print_colors,
+        ):
+            viiv.main()
+        return actions.mock_calls
+
+    def test_random_theme(self):
+        """-r generates the random theme, or the target theme if given"""
+        self.assertEqual(self._main("-r"), [mock.call.generate_random_theme(None)])
+        self.assertEqual(
+            self._main("-r", "-t", "nord-dark"),
+            [mock.call.generate_random_theme("nord-dark")],
+        )
+
+    def test_random_and_target_themes_generated_once(self):
+        """-r is skipped if it would only generate the themes of -g again"""
+        self.assertEqual(
+            self._main("-r", "-g", "-t", "nord-dark"),
+            [mock.call.generate_themes("nord-dark")],
+        )
+        self.assertEqual(
+            self._main("-r", "-g"),
+            [mock.call.generate_random_theme(None), mock.call.generate_themes(None)],
+        )
+        self.assertEqual(
+            self._main("-r", "-g", theme_name="nord-dark"),
+            [mock.call.generate_themes(None)],
+        )
+
+    def test_long_options(self):
+        """Long options work the same as the short ones"""
+        self.assertEqual(
+            self._main("--generate", "--theme=nord-dark"),
+            [mock.call.generate_themes("nord-dark")],
+        )
+        self.assertEqual(
+            self._main("--random_theme", "--print_palette=C_1"),
+            [
+                mock.call.generate_random_theme(None),
+                mock.call.print_palette("C_1"),
+            ],
+        )
+
+    def test_print_after_generate(self):
+        """Printing runs after generating whatever the option order is"""
+        self.assertEqual(
+            self._main("-P", "C_1", "-p", "editor", "-g", "-t", "nord-dark"),
+            [
+                mock.call.generate_themes("nord-dark"),
+                mock.call.print_palette("C_1"),
+                mock.call.print_colors("editor", "nord-dark"),
+            ],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
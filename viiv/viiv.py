@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 """Functions to help quickly generate customized token colors in VsCode theme file."""
 
+import functools
 import getopt
 import json
 import os
@@ -8,6 +9,7 @@ import random
 import re
 import sys
 from enum import Enum
+from typing import NamedTuple
 
 from peelee import peelee as pe
 
@@ -22,7 +24,10 @@ RGB_HEX_REGEX_WITHOUT_ALPHA = r"#[a-zA-Z0-9]{6}"
 RGB_HEX_REGEX_WITH_ALPHA = r"#[a-zA-Z0-9]{8}"
 LIGHT_BOLD_TOKEN_SCOPE_REGEX_DEFAULT = r".*(keyword|type).*"
 
-HEX_NUMBER_STR_PATTERN = re.compile(r"^0x[0-9a-zA-Z]+$")
+# foreground properties which are darkened in LIGHT mode
+LIGHT_MODE_DARKEN_PROPERTY_PATTERN = re.compile(
+    r".*(warning|modified).*foreground.*", re.IGNORECASE
+)
 
 # debug
 DEBUG_PROPERTY = []
@@ -75,11 +80,68 @@ class MatchRule(Enum):
     FUZZY = 5
 
 
+class GroupMatcher(NamedTuple):
+    """Group name prepared for the match rules when the config is loaded."""
+
+    name: str
+    lower: str
+    dot_prefixed: str
+    dot_suffixed: str
+    pattern: re.Pattern
+
+    @classmethod
+    def of(cls, group: str) -> "GroupMatcher":
+        """Create the matcher of the group."""
+        lower = group.lower()
+        return cls(
+            group,
+            lower,
+            f".{lower}",
+            f"{lower}.",
+            re.compile(group, re.IGNORECASE | re.ASCII),
+        )
+
+
+def _match_exact(target_property, target_property_lower, group_matcher):
+    """Check if the property is the group."""
+    return target_property_lower == group_matcher.lower
+
+
+def _match_endswith(target_property, target_property_lower, group_matcher):
+    """Check if the property ends with the group."""
+    return target_property_lower.endswith(group_matcher.dot_prefixed)
+
+
+def _match_startswith(target_property, target_property_lower, group_matcher):
+    """Check if the property starts with the group."""
+    return target_property_lower.startswith(group_matcher.dot_suffixed)
+
+
+def _match_contains(target_property, target_property_lower, group_matcher):
+    """Check if the property contains the group."""
+    return group_matcher.lower in target_property_lower
+
+
+def _match_fuzzy(target_property, target_property_lower, group_matcher):
+    """Check if the property matches the group pattern."""
+    return group_matcher.pattern.match(target_property) is not None
+
+
+# match rule tests in the order of the match rule priority
+MATCH_RULE_TESTS = {
+    MatchRule.EXACT: _match_exact,
+    MatchRule.ENDSWITH: _match_endswith,
+    MatchRule.STARTSWITH: _match_startswith,
+    MatchRule.CONTAINS: _match_contains,
+    MatchRule.FUZZY: _match_fuzzy,
+}
+
+
 def _to_int(value: str) -> int:
     """Convert string to int."""
     if isinstance(value, int):
         return value
-    elif isinstance(value, str) and (HEX_NUMBER_STR_PATTERN.match(value)):
+    elif isinstance(value, str) and value.startswith(("0x", "0X")):
         return int(value, 16)
     return int(value)
 
@@ -97,17 +159,25 @@ def normalize_range(range_values: list[str]) -> list[str]:
     _random_range([1, 12])
     -> ['01', '02', '03', '04', '05', '06', '07', '08', '09', '10', '11', '12']
     """
-    _random = []
     _start = _to_int(range_values[0])
     _end = _to_int(range_values[1])
-    for i in range(_start, _end):
-        _random.append(str(i) if i >= 10 else str("0" + str(i)))
-    return _random
+    return list(_format_range(_start, _end))
+
+
+@functools.lru_cache(maxsize=256)
+def _format_range(start: int, end: int) -> tuple[str, ...]:
+    """Format the numbers in the range as 2-digit strings.
+
+    The same ranges are configured for many colors, so the results are cached.
+    """
+    return tuple(f"{i:02d}" for i in range(start, end))
 
 
-class ColorsWrapper(dict):
+class ColorsWrapper:
     """Wrapper class for color."""
 
+    __slots__ = ("colors", "area", "group", "replace_color_component")
+
     def __init__(
         self,
         colors: list,
@@ -119,15 +189,12 @@ class ColorsWrapper(dict):
         self.area = area
         self.group = group
         self.replace_color_component = replace_color_component or [ColorComponent.ALL]
-        super().__init__(
-            colors=colors,
-            group=group,
-            area=area,
-            replace_color_component=replace_color_component,
-        )
+
+    def __repr__(self):
+        return f"ColorsWrapper({self.area}, {self.group}, {self.colors})"
 
 
-class ColorConfig(dict):
+class ColorConfig:
     """Wrapper class for color.
 
     One color consists of hex, color ranges for basic, light, and alpha.
@@ -163,6 +230,17 @@ class ColorConfig(dict):
     }
     """
 
+    __slots__ = (
+        "config",
+        "area",
+        "group",
+        "replace_color_component",
+        "hex",
+        "alpha_range",
+        "basic_range",
+        "light_range",
+    )
+
     def __init__(
         self,
         config,
@@ -178,7 +256,6 @@ class ColorConfig(dict):
         self.alpha_range = config.get("alpha_range", None)
         self.basic_range = config.get("basic_range", None)
         self.light_range = config.get("light_range", None)
-        super().__init__(config=self.config)
 
     def __repr__(self):
         return f"Color({self.config})"
@@ -202,34 +279,48 @@ class ColorConfig(dict):
             and self.light_range[0] < self.light_range[1]
         )
 
-        if has_hex:
-            _head = [self.hex]
-        elif has_basic and has_light:
-            _head = [
-                "C_" + basic + "_" + light
-                for basic in normalize_range(self.basic_range)
-                for light in normalize_range(self.light_range)
-            ]
-        else:
-            _head = ["#000000"]
-
-        if has_alpha:
-            _tail = []
-            for alpha in normalize_range(self.alpha_range):
-                alpha = format(int(alpha), "x")
-                if len(alpha) == 1:
-                    alpha = "0" + alpha
-                _tail.append(alpha)
-        else:
-            _tail = [""]
-        _colors = [f"{head}{tail}" for head in _head for tail in _tail]
+        has_basic_and_light = not has_hex and has_basic and has_light
+        _colors = _generate_colors(
+            self.hex if has_hex else None,
+            tuple(self.basic_range) if has_basic_and_light else None,
+            tuple(self.light_range) if has_basic_and_light else None,
+            tuple(self.alpha_range) if has_alpha else None,
+        )
 
         _wrapper = ColorsWrapper(
-            _colors, self.area, self.group, self.replace_color_component
+            list(_colors), self.area, self.group, self.replace_color_component
         )
         return _wrapper
 
 
+@functools.lru_cache(maxsize=256)
+def _generate_colors(hex_value, basic_range, light_range, alpha_range) -> tuple:
+    """Generate colors by using hex or basic and light ranges, with alpha range.
+
+    Many color configs share the same ranges, so the results are cached.
+    """
+    if hex_value is not None:
+        _head = [hex_value]
+    elif basic_range is not None and light_range is not None:
+        _lights = normalize_range(light_range)
+        _head = [
+            f"C_{basic}_{light}"
+            for basic in normalize_range(basic_range)
+            for light in _lights
+        ]
+    else:
+        _head = ["#000000"]
+
+    if alpha_range is not None:
+        _tail = [
+            f"{alpha:02x}"
+            for alpha in range(_to_int(alpha_range[0]), _to_int(alpha_range[1]))
+        ]
+    else:
+        _tail = [""]
+    return tuple(f"{head}{tail}" for head in _head for tail in _tail)
+
+
 class Config(dict):
     """Wrapper class for color config
 
@@ -245,19 +336,17 @@ class Config(dict):
         self.areas = list(
             filter(lambda k: k not in ["options", "themes"], self.config.keys())
         )
+        # areas which only apply to properties containing the area name
+        self.property_areas = {area for area in self.areas if is_property_area(area)}
         # default color config and token default color config
-        default_color_config = list(
-            filter(
-                lambda x: "default" in x["groups"],
-                self.config["default"],
-            )
-        )[0]
-        default_token_color_config = list(
-            filter(
-                lambda x: len(x["groups"]) == 1 and x["groups"][0] == "token_default",
-                self.config["token"],
-            )
-        )[0]
+        default_color_config = next(
+            x for x in self.config["default"] if "default" in x["groups"]
+        )
+        default_token_color_config = next(
+            x
+            for x in self.config["token"]
+            if len(x["groups"]) == 1 and x["groups"][0] == "token_default"
+        )
         self.default_color_config = ColorConfig(
             default_color_config["color"], "default", default_color_config["groups"][0]
         )
@@ -277,24 +366,50 @@ class Config(dict):
             "static_decoration_color_basic_range", [1, 11]
         )
         # decoration groups
-        self.decoration_groups = []
+        self.decoration_groups = frozenset(
+            group
+            for area in self.areas
+            for color_config in self.config[area]
+            if "decoration" in color_config["groups"]
+            for group in color_config["groups"]
+        )
+
+        # all configured groups, sorted by name
+        self.all_groups = sorted(
+            {
+                group
+                for area in self.areas
+                for color_config in self.config[area]
+                for group in color_config["groups"]
+            }
+        )
+
+        # resolved color wrappers by (target_property, target_area)
+        self.color_wrappers_cache = {}
+
+        # enabled color configs of each area, with the matchers of their sorted
+        # groups (lowercased names and compiled patterns for the fuzzy match
+        # rule), the resolved color components to replace and the color
+        self.area_color_configs = {}
         for area in self.areas:
+            self.area_color_configs[area] = []
             for color_config in self.config[area]:
+                if not color_config.get("enabled", True):
+                    continue
                 groups = color_config["groups"]
-                if "decoration" in groups:
-                    self.decoration_groups.extend(groups)
+                groups.sort(reverse=True)
+                group_matchers = [GroupMatcher.of(group) for group in groups]
+                self.area_color_configs[area].append(
+                    (
+                        group_matchers,
+                        self._get_replace_color_component(area, color_config),
+                        color_config["color"],
+                    )
+                )
 
         # random base range for decoration groups
-        if self.random_decoration_color:
-            random_int = random.randint(
-                self.random_decoration_color_basic_range[0],
-                self.random_decoration_color_basic_range[1],
-            )
-            self.basic_range_for_decoration_groups = [random_int, random_int + 1]
-        else:
-            self.basic_range_for_decoration_groups = (
-                self.static_decoration_color_basic_range
-            )
+        self.basic_range_for_decoration_groups = None
+        self.pick_decoration_basic_range()
 
         super().__init__(
             config=self.config,
@@ -304,6 +419,28 @@ class Config(dict):
             decoration_groups=self.decoration_groups,
         )
 
+    def pick_decoration_basic_range(self):
+        """Pick the basic range shared by the decoration groups.
+
+        It's random if the option 'random_decoration_color' is on, so it's picked again for each generated theme. The cached color wrappers of the decoration groups are dropped if the range changed.
+        """
+        if self.random_decoration_color:
+            random_int = random.randint(
+                self.random_decoration_color_basic_range[0],
+                self.random_decoration_color_basic_range[1],
+            )
+            basic_range = [random_int, random_int + 1]
+        else:
+            basic_range = self.static_decoration_color_basic_range
+        if basic_range == self.basic_range_for_decoration_groups:
+            return
+        self.basic_range_for_decoration_groups = basic_range
+        self.color_wrappers_cache = {
+            cache_key: color_wrappers
+            for cache_key, color_wrappers in self.color_wrappers_cache.items()
+            if not any(w.group in self.decoration_groups for w in color_wrappers)
+        }
+
     def get_discard_red_dark_color(self):
         """Return value of the option 'discard_dark_red_color'."""
         return self.options["discard_dark_red_color"]
@@ -333,51 +470,62 @@ class Config(dict):
         Retrun :
             Color object include area info, only those color perperty belong to that area can use that color. Color for backkground cannot be used by foreground color perperty.
             If not found, return the default color.
+
+            The result is cached per (target_property, target_area) since it only depends on the config.
         """
-        _matched_color_configs = []
+        cache_key = (target_property, target_area)
+        color_wrappers = self.color_wrappers_cache.get(cache_key)
+        if color_wrappers is None:
+            color_wrappers = self._find_color_wrappers(target_property, target_area)
+            self.color_wrappers_cache[cache_key] = color_wrappers
+        return color_wrappers
+
+    def _find_color_wrappers(self, target_property, target_area=None) -> list:
+        """Find the color wrappers of the target property without using the cache."""
+        # the default area wins if it matches, otherwise the area matched with
+        # the highest priority match rule (the first one if the same)
+        most_matched_color_config = None
+        default_area_pending = (
+            not target_area or target_area == "default"
+        ) and "default" in self.areas
+        target_property_lower = target_property.lower()
         for area in self.areas:
             if target_area and area != target_area:
                 continue
-            if is_property_area(area) and target_property.lower().find(area) == -1:
+            if area in self.property_areas and area not in target_property_lower:
                 continue
             # try to find the configured color in the matching order
-            _matched_color_config_dict = self._get_color(area, target_property)
+            _matched_color_config_dict = self._get_color(
+                area, target_property, target_property_lower
+            )
+            if area == "default":
+                default_area_pending = False
+                if _matched_color_config_dict:
+                    most_matched_color_config = _matched_color_config_dict
+                    break
+            if not _matched_color_config_dict:
+                continue
+            if (
+                most_matched_color_config is None
+                or _matched_color_config_dict["match_rule"].value
+                < most_matched_color_config["match_rule"].value
+            ):
+                most_matched_color_config = _matched_color_config_dict
+            # only the default area can beat an exact match
             if (
-                _matched_color_config_dict
-                and _matched_color_config_dict not in _matched_color_configs
+                most_matched_color_config["match_rule"] == MatchRule.EXACT
+                and not default_area_pending
             ):
-                _matched_color_configs.append(_matched_color_config_dict)
+                break
 
         color_wrappers = []
-        if _matched_color_configs:
+        if most_matched_color_config:
             if target_property in DEBUG_PROPERTY:
-                print(_matched_color_configs)
-
-            default_area_matched_color_configs = list(
-                filter(lambda x: x["area"] == "default", _matched_color_configs)
-            )
-            if default_area_matched_color_configs:
-                _matched_color_configs = default_area_matched_color_configs
-
-            # clever cost?
-            most_matched_color_config = min(
-                (
-                    c
-                    for c in list(
-                        filter(
-                            lambda c: c["color_config"] is not None,
-                            _matched_color_configs,
-                        )
-                    )
-                ),
-                key=lambda x: x["match_rule"].value,
+                print(most_matched_color_config)
+            color_wrappers.append(
+                most_matched_color_config["color_config"].create_colors_wrapper()
             )
 
-            if most_matched_color_config:
-                color_wrappers.append(
-                    most_matched_color_config["color_config"].create_colors_wrapper()
-                )
-
         if len(color_wrappers) > 0:
             if target_property in DEBUG_PROPERTY:
                 print([c.area for c in color_wrappers])
@@ -393,15 +541,23 @@ class Config(dict):
         ), f"no color found ({target_property} - {target_area})"
         return color_wrappers
 
-    def _match(self, groups, target_property):
+    def _match(
+        self,
+        group_matchers,
+        target_property,
+        target_property_lower=None,
+        match_rule_cap=None,
+    ):
         """Match the target property with the group.
 
         By using all MatchRules to check if the target property matches any group in the groups.
         If multiple groups matched the target property, then pick up the one using match rule having the least value(which means highest priority).
 
         Parameters:
-            group (str): group name
+            group_matchers (list): GroupMatcher of each group, built when the config is loaded
             target_property (str): target property
+            target_property_lower (str): lowercased target property, computed if not given
+            match_rule_cap (MatchRule): only try the match rules with higher priority than it
 
         Returns:
             dict: the matched group and the matched rule
@@ -412,29 +568,25 @@ class Config(dict):
                     "group": "success"
                 }
         """
-        matched_groups = []
-        for match_rule in MatchRule:
-            for group in groups:
-                if (
-                    match_rule == MatchRule.EXACT
-                    and target_property.lower() == group.lower()
-                    or match_rule == MatchRule.ENDSWITH
-                    and target_property.lower().endswith(f".{group.lower()}")
-                    or match_rule == MatchRule.STARTSWITH
-                    and target_property.lower().startswith(f"{group.lower()}.")
-                    or match_rule == MatchRule.CONTAINS
-                    and target_property.lower().find(group.lower()) != -1
-                    or match_rule == MatchRule.FUZZY
-                    and re.match(group, target_property, re.IGNORECASE)
+        if target_property_lower is None:
+            target_property_lower = target_property.lower()
+        # the match rules are tried in priority order, so the first matched
+        # group is the one with the least match rule value
+        for match_rule, match_rule_test in MATCH_RULE_TESTS.items():
+            if match_rule_cap is not None and match_rule.value >= match_rule_cap.value:
+                break
+            for group_matcher in group_matchers:
+                if match_rule_test(
+                    target_property, target_property_lower, group_matcher
                 ):
-                    matched_groups.append({"match_rule": match_rule, "group": group})
-        if not matched_groups:
-            return None
-
-        if target_property in DEBUG_PROPERTY:
-            print(matched_groups)
-
-        return min(matched_groups, key=lambda x: x["match_rule"].value)
+                    matched_group = {
+                        "match_rule": match_rule,
+                        "group": group_matcher.name,
+                    }
+                    if target_property in DEBUG_PROPERTY:
+                        print(matched_group)
+                    return matched_group
+        return None
 
     def _get_replace_color_component(self, area, groups_config):
         """Get the replace color component.
@@ -454,7 +606,7 @@ class Config(dict):
             )
         return replace_color_component
 
-    def _get_color(self, area, target_property) -> dict:
+    def _get_color(self, area, target_property, target_property_lower=None) -> dict:
         """Get the color config.
 
         Each area has many color configurations for different groups.
@@ -479,32 +631,35 @@ class Config(dict):
 
             area (str): area name
             target_property (str): target property
+            target_property_lower (str): lowercased target property, computed if not given
 
         Returns:
             dict: the matched group and the matched rule
         """
-        area_config = self.config[area]
-        _matches = []
-        for groups_config in area_config:
-            enabled = groups_config.get("enabled", True)
-            if not enabled:
-                continue
-            groups = groups_config["groups"]
-            groups.sort(reverse=True)
-            _match = self._match(groups, target_property)
+        if target_property_lower is None:
+            target_property_lower = target_property.lower()
+        area_color_configs = self.area_color_configs[area]
+        # the first color config matched with the highest priority match rule;
+        # later color configs only need to try higher priority match rules
+        _most_matched_config = None
+        for group_matchers, replace_color_component, color in area_color_configs:
+            _match = self._match(
+                group_matchers,
+                target_property,
+                target_property_lower,
+                _most_matched_config["match_rule"] if _most_matched_config else None,
+            )
             if _match:
-                color = groups_config["color"]
-                replace_color_component = self._get_replace_color_component(
-                    area, groups_config
-                )
                 _match["color"] = color
                 _match["replace_color_component"] = replace_color_component
-                _matches.append(_match)
+                _most_matched_config = _match
+                # no later color config can beat an exact match
+                if _match["match_rule"] == MatchRule.EXACT:
+                    break
 
-        if not _matches:
+        if not _most_matched_config:
             return {}
 
-        _most_matched_config = min(_matches, key=lambda x: x["match_rule"].value)
         color = _most_matched_config["color"]
         group = _most_matched_config["group"]
 
@@ -549,17 +704,50 @@ class TemplateConfig(dict):
 
         """
         if component == ColorComponent.ALPHA:
-            _color = old_color[0:7] + new_color[7:9]
-        elif re.match(RGB_HEX_REGEX, old_color):
+            _color = f"{old_color[0:7]}{new_color[7:9]}"
+        elif old_color.startswith("#"):
             # if it's already RGB HEX color, then cannot replace basic and light color with color placeholder. so, return directly
+            # colors are either placeholders (C_XX_YY[AA]) or RGB HEX (#XXXXXX[XX]), so the prefix is enough to tell them apart
             return old_color
         elif component == ColorComponent.LIGHT:
-            _color = old_color[0:5] + new_color[5:7] + old_color[7:]
+            _color = f"{old_color[0:5]}{new_color[5:7]}{old_color[7:]}"
         elif component == ColorComponent.BASIC:
-            _color = old_color[0:2] + new_color[2:5] + old_color[5:]
+            _color = f"{old_color[0:2]}{new_color[2:5]}{old_color[5:]}"
 
         return _color
 
+    @staticmethod
+    def replace_color_components(old_color, new_color, components: list):
+        """
+        Replace the basic, light and alpha components of a color in one pass.
+
+        It gives the same result as calling append_or_replace_alpha for each of
+        the BASIC, LIGHT and ALPHA components in turn.
+
+        Args:
+            old_color (str): The original color string.
+            new_color (str): The new color string.
+            components (list): The color components to be replaced or appended.
+
+        Returns:
+            str: The updated color string.
+        """
+        # basic and light color cannot be replaced in RGB HEX color
+        is_hex = old_color.startswith("#")
+        if ColorComponent.BASIC in components and not is_hex:
+            basic = new_color[2:5]
+        else:
+            basic = old_color[2:5]
+        if ColorComponent.LIGHT in components and not is_hex:
+            light = new_color[5:7]
+        else:
+            light = old_color[5:7]
+        if ColorComponent.ALPHA in components:
+            alpha = new_color[7:9]
+        else:
+            alpha = old_color[7:]
+        return f"{old_color[0:2]}{basic}{light}{alpha}"
+
     def generate_template(self, config: Config = None):
         """
         Generates a template based on the provided configuration.
@@ -573,21 +761,23 @@ class TemplateConfig(dict):
         if config is None:
             _color_config_path = f"{os.getcwd()}/config.json"
             config = Config(config_path=_color_config_path)
+        else:
+            # pick the decoration range again as a fresh config would
+            config.pick_decoration_basic_range()
 
         workbench_colors = {}
-        default_processed_properties = []
-        customized_properties = []
+        default_processed_properties = set()
+        customized_properties = set()
         # workbench colors
-        used_groups = []
+        # dict keeps the first-used order of groups for used_groups.json
+        used_groups = {}
         for property_name in self.color_properties:
             color_wrappers = config.get_color_wrappers(property_name)
             if color_wrappers is None or not isinstance(color_wrappers, list):
                 print(property_name, type(color_wrappers))
                 continue
-            color_wrappers_areas = [w.area for w in color_wrappers]
-            if (
-                property_name in default_processed_properties
-                and "default" not in color_wrappers_areas
+            if property_name in default_processed_properties and not any(
+                w.area == "default" for w in color_wrappers
             ):
                 continue
             debug_property_counter = 0
@@ -600,41 +790,27 @@ class TemplateConfig(dict):
                 # we are not processing the token color here
                 if area == "token":
                     continue
-                color = colors[random.randint(0, len(colors) - 1)]
-                color_orig = color
+                color = random.choice(colors)
                 if property_name in workbench_colors:
                     if property_name in customized_properties:
                         continue
                     if area not in ["default", "token"]:
                         continue
-                    old_color = workbench_colors[property_name]
-                    _changed = False
-                    if ColorComponent.BASIC in replace_color_component:
-                        color = self.append_or_replace_alpha(
-                            old_color if not _changed else color,
-                            color_orig,
-                            ColorComponent.BASIC,
-                        )
-                        _changed = True
-                    if ColorComponent.LIGHT in replace_color_component:
-                        color = self.append_or_replace_alpha(
-                            old_color if not _changed else color,
-                            color_orig,
-                            ColorComponent.LIGHT,
-                        )
-                        _changed = True
-                    if ColorComponent.ALPHA in replace_color_component:
-                        color = self.append_or_replace_alpha(
-                            old_color if not _changed else color,
-                            color_orig,
-                            ColorComponent.ALPHA,
-                        )
-                        _changed = True
-                    if (
+                    # the new color is kept as a whole for ALL or the
+                    # property's own group, so only splice it otherwise
+                    if not (
                         ColorComponent.ALL in replace_color_component
                         or property_name == group
+                    ) and (
+                        ColorComponent.BASIC in replace_color_component
+                        or ColorComponent.LIGHT in replace_color_component
+                        or ColorComponent.ALPHA in replace_color_component
                     ):
-                        color = color_orig
+                        color = TemplateConfig.replace_color_components(
+                            workbench_colors[property_name],
+                            color,
+                            replace_color_component,
+                        )
                 if group in DEBUG_GROUP:
                     print(
                         f" (G {debug_group_counter}) >>>: '{property_name}' is processed by the area '{area}' (color matching rule '{group}') - '{color}' - '{replace_color_component}' - {[_w.area for _w in color_wrappers]}\n"
@@ -646,14 +822,13 @@ class TemplateConfig(dict):
                     )
                     debug_property_counter += 1
                 if area == "default" and group != "default":
-                    default_processed_properties.append(property_name)
+                    default_processed_properties.add(property_name)
                 if group == property_name:
-                    customized_properties.append(property_name)
-                if group not in used_groups:
-                    used_groups.append(group)
+                    customized_properties.add(property_name)
+                used_groups.setdefault(group)
                 workbench_colors[property_name] = color
 
-        workbench_colors = dict(sorted(workbench_colors.items(), key=lambda x: x[0]))
+        workbench_colors = dict(sorted(workbench_colors.items()))
         self.config["colors"] = workbench_colors
 
         # token colors
@@ -667,13 +842,12 @@ class TemplateConfig(dict):
             ), f"how can we get multiple color wrappers for token ({scope})?"
             color_wrapper = color_wrappers[0]
             _colors = color_wrapper.colors
-            new_color = _colors[random.randint(0, len(_colors) - 1)]
+            new_color = random.choice(_colors)
             new_token_configs.append(
                 {"scope": scope, "settings": {"foreground": new_color}}
             )
             group = color_wrapper.group
-            if group not in used_groups:
-                used_groups.append(group)
+            used_groups.setdefault(group)
             area = color_wrapper.area
             if scope in DEBUG_PROPERTY:
                 print(
@@ -682,21 +856,9 @@ class TemplateConfig(dict):
         new_token_configs.sort(key=lambda x: x["scope"])
         self.config["tokenColors"] = new_token_configs
         _dump_json_file(self.config_path, self.config)
-        _dump_json_file("used_groups.json", used_groups)
+        _dump_json_file("used_groups.json", list(used_groups))
 
-        # clever code?!
-        all_groups = sorted(
-            list(
-                set(
-                    (
-                        c
-                        for a in config.areas
-                        for g in config.config[a]
-                        for c in g["groups"]
-                    )
-                )
-            )
-        )
+        all_groups = config.all_groups
         _dump_json_file("all_groups.json", all_groups)
 
         # good auto-completion
@@ -717,11 +879,10 @@ def _dump_json_file(json_file_path, json_data):
         None
     """
     if not os.path.exists(os.path.dirname(json_file_path)):
-        json_file_path = (
-            os.getcwd() + os.path.sep + "output" + os.path.sep + json_file_path
-        )
+        json_file_path = os.path.join(os.getcwd(), "output", json_file_path)
+    # serialize in one go and write once rather than per encoder chunk
     with open(json_file_path, "w", encoding="utf-8") as f:
-        json.dump(json_data, f, indent=4)
+        f.write(json.dumps(json_data, indent=4))
 
 
 def print_colors(filter_value, theme="random"):
@@ -730,10 +891,9 @@ def print_colors(filter_value, theme="random"):
     random_theme_json = load_json_file(random_theme_json_file)
     theme_template_json = load_json_file(THEME_TEMPLATE_JSON_FILE)
     colors = random_theme_json["colors"]
+    filter_pattern = re.compile(f".*{filter_value}.*", re.IGNORECASE)
     for k, v in colors.items():
-        if k.lower().find(filter_value) != -1 or re.match(
-            f".*{filter_value}.*", k, re.IGNORECASE
-        ):
+        if k.lower().find(filter_value) != -1 or filter_pattern.match(k):
             print(pe.bg(v, f"{k}: {v} ({theme_template_json['colors'][k]})"))
 
 
@@ -755,41 +915,28 @@ def print_palette(filter_value=None):
     """
     if filter_value is not None and len(filter_value.strip()) == 0:
         filter_value = None
-    random_palette_json_file = f"{os.getcwd()}/output/random-palette.json"
-    with open(random_palette_json_file, "r", encoding="utf-8") as file:
-        random_palette_json = json.load(file)
+    filter_pattern = (
+        re.compile(f".*{filter_value}.*", re.IGNORECASE) if filter_value else None
+    )
+    random_palette_json = load_json_file(PALETTE_FILE_PATH)
     for k, v in random_palette_json.items():
-        if (
-            filter_value
-            and k != filter_value
-            and not re.match(f".*{filter_value}.*", k, re.IGNORECASE)
-        ):
+        if filter_value and k != filter_value and not filter_pattern.match(k):
             continue
         print(pe.bg(v, f"{k}: {v}"))
 
     print("\nSelected UI Palette:")
-    with open(SELECTED_UI_COLOR_FILE_PATH, encoding="utf-8") as selected_ui_file:
-        selected_ui_palette_json = json.load(selected_ui_file)
-        for k, v in selected_ui_palette_json.items():
-            if (
-                filter_value
-                and k != filter_value
-                and not re.match(f".*{filter_value}.*", k, re.IGNORECASE)
-            ):
-                continue
-            print(pe.bg(v, f"{k}: {v}"))
+    selected_ui_palette_json = load_json_file(SELECTED_UI_COLOR_FILE_PATH)
+    for k, v in selected_ui_palette_json.items():
+        if filter_value and k != filter_value and not filter_pattern.match(k):
+            continue
+        print(pe.bg(v, f"{k}: {v}"))
 
     print("\nSelected Token Palette:")
-    with open(SELECTED_TOKEN_COLOR_FILE_PATH, encoding="utf-8") as selected_token_file:
-        selected_token_palette_json = json.load(selected_token_file)
-        for k, v in selected_token_palette_json.items():
-            if (
-                filter_value
-                and k != filter_value
-                and not re.match(f".*{filter_value}.*", k, re.IGNORECASE)
-            ):
-                continue
-            print(pe.bg(v, f"{k}: {v}"))
+    selected_token_palette_json = load_json_file(SELECTED_TOKEN_COLOR_FILE_PATH)
+    for k, v in selected_token_palette_json.items():
+        if filter_value and k != filter_value and not filter_pattern.match(k):
+            continue
+        print(pe.bg(v, f"{k}: {v}"))
 
 
 def discard_red_dark_color(palette_color_data):
@@ -801,8 +948,7 @@ def discard_red_dark_color(palette_color_data):
     if (max_rgb == workbench_color_rgb[0]) and (max_rgb not in workbench_color_rgb[1:]):
         # Find the replacement in dark colors
         random_dark_base_color = None
-        for index in range(8, 13):  # TODO
-            index = pe.padding(index)
+        for index in _format_range(8, 13):  # TODO
             random_workbench_color_hex = palette_color_data.get(f"C_{index}_59")
             if random_workbench_color_hex is None:
                 continue
@@ -823,8 +969,7 @@ def discard_red_dark_color(palette_color_data):
         print(
             f"Discard red color {workbench_color_hex} - Replace with '{random_dark_color}'"
         )
-        for i in range(60):
-            i = pe.padding(i)
+        for i in _format_range(0, 60):
             palette_color_data[f"C_{workbench_color_index}_{i}"] = palette_color_data[
                 f"C_{random_dark_base_color}_{i}"
             ]
@@ -865,8 +1010,11 @@ def _generate_random_theme_file(
 
     Good valus for dark colors min and max: 5, 15. The maximum value of dark colors max should be 30. No bigger value should be used unless for light-mode theme. When the range is changed, the values used in config.json might be tuned accordingly. With the configuration in v0.2.31, the best values are 15,20.
 
+    The palette files (random, selected UI and selected token palettes) are
+    written too, unless dump_palette_files is False.
+
     Returns:
-        None
+        tuple: the palette data, the selected UI colors and the selected token colors
     """
     theme_mode = kwargs.get("theme_mode")
     if theme_mode is None:
@@ -878,7 +1026,8 @@ def _generate_random_theme_file(
     theme_name = kwargs.get("theme_name", "viiv")
     print(theme_name)
     template_config = TemplateConfig()
-    template_config.generate_template()
+    # reuse the loaded config rather than parsing config.json again per theme
+    template_config.generate_template(config)
     template_config_data = template_config.config
     workbench_base_color = kwargs.get("workbench_base_color")
     workbench_base_color_name = kwargs.get("workbench_base_color_name", "RANDOM")
@@ -954,50 +1103,57 @@ def _generate_random_theme_file(
 
     selected_ui_color = {}
     selected_token_color = {}
+    is_light_mode = theme_mode == "LIGHT"
+    light_bold_token_scope_pattern = re.compile(
+        light_bold_token_scope_regex, re.IGNORECASE
+    )
 
-    for property_name, color in template_config_data["colors"].items():
-        color = template_config_data["colors"][property_name]
+    template_colors = template_config_data["colors"]
+    for property_name, color in template_colors.items():
         color_placeholder = color[0:7]
-        alpha = color[7:9]
-        if color_placeholder in palette_data:
-            color_replacement = palette_data[color_placeholder] + alpha
-            template_config_data["colors"][property_name] = color_replacement
-            selected_ui_color[color_placeholder] = color_replacement
+        palette_color = palette_data.get(color_placeholder)
+        if palette_color is not None:
+            color = palette_color + color[7:9]
+            template_colors[property_name] = color
+            selected_ui_color[color_placeholder] = color
         # special processing #TODO - move to configuration
-        if theme_mode == "LIGHT" and re.match(
-            ".*(warning|modified).*foreground.*", property_name, re.IGNORECASE
-        ):
-            color = template_config_data["colors"][property_name]
-            template_config_data["colors"][property_name] = pe.set_lightness(
-                color, 0.35
-            )
+        if is_light_mode and LIGHT_MODE_DARKEN_PROPERTY_PATTERN.match(property_name):
+            template_colors[property_name] = pe.set_lightness(color, 0.35)
 
+    # many token scopes share a placeholder, so resolve each one only once
+    token_palette_colors = {}
     for token_color in template_config_data["tokenColors"]:
-        foreground = token_color["settings"]["foreground"]
+        settings = token_color["settings"]
+        foreground = settings["foreground"]
         color_placeholder = foreground[0:7]
-        alpha = foreground[7:9]
-        palette_color = palette_data[color_placeholder]
-
-        # special processing #TODO - move to configuration
-        if theme_mode == "LIGHT":
-            hls_color = pe.hex2hls(palette_color)
-            lightness = hls_color[1]
-            if lightness > 0.35:
-                palette_color = pe.set_lightness(palette_color, 0.35)
-
-        color_replacement = palette_color + alpha
-        token_color["settings"]["foreground"] = color_replacement
+        palette_color = token_palette_colors.get(color_placeholder)
+        if palette_color is None:
+            palette_color = palette_data[color_placeholder]
+            # special processing #TODO - move to configuration
+            if is_light_mode:
+                hls_color = pe.hex2hls(palette_color)
+                lightness = hls_color[1]
+                if lightness > 0.35:
+                    palette_color = pe.set_lightness(palette_color, 0.35)
+            token_palette_colors[color_placeholder] = palette_color
+
+        color_replacement = palette_color + foreground[7:9]
+        settings["foreground"] = color_replacement
         token_scope = token_color["scope"]
-        is_keyword_or_type = re.match(
-            light_bold_token_scope_regex, token_scope, re.IGNORECASE
-        )
-        if theme_mode == "LIGHT" and is_keyword_or_type:
-            token_color["settings"]["fontStyle"] = "bold"
+        if is_light_mode and light_bold_token_scope_pattern.match(token_scope):
+            settings["fontStyle"] = "bold"
         selected_token_color[color_placeholder] = color_replacement
 
     random_theme_path = f"{os.getcwd()}/themes/{theme_name.lower()}-color-theme.json"
-    _dump_json_file(PALETTE_FILE_PATH, palette_data)
     _dump_json_file(random_theme_path, template_config_data)
+    if kwargs.get("dump_palette_files", True):
+        _dump_palette_files(palette_data, selected_ui_color, selected_token_color)
+    return palette_data, selected_ui_color, selected_token_color
+
+
+def _dump_palette_files(palette_data, selected_ui_color, selected_token_color):
+    """Write the random palette and the selected UI and token palettes."""
+    _dump_json_file(PALETTE_FILE_PATH, palette_data)
     _dump_json_file(SELECTED_UI_COLOR_FILE_PATH, selected_ui_color)
     _dump_json_file(SELECTED_TOKEN_COLOR_FILE_PATH, selected_token_color)
 
@@ -1005,13 +1161,19 @@ def _generate_random_theme_file(
 def generate_themes(target_theme=None):
     """
     Generates configured themes.
+
+    The palette files are shared by all themes, so only the ones of the last
+    generated theme are written.
     """
+    palette_files = None
+    target_theme_pattern = (
+        re.compile(f".*{target_theme}.*", re.IGNORECASE) if target_theme else None
+    )
     for theme_config in config.config["themes"]:
         theme_mode = theme_config.get("theme_mode", "DARK").upper()
         theme_name = theme_config["name"]
         if target_theme and (
-            theme_name != target_theme
-            and not re.match(f".*{target_theme}.*", theme_name, re.IGNORECASE)
+            theme_name != target_theme and not target_theme_pattern.match(theme_name)
         ):
             continue
         workbench_base_color_name = theme_config.get(
@@ -1069,7 +1231,7 @@ def generate_themes(target_theme=None):
                 workbench_editor_color, workbench_base_color_rate
             )
         workbench_editor_color_id = theme_config.get("workbench_editor_color_id")
-        _generate_random_theme_file(
+        palette_files = _generate_random_theme_file(
             token_colors_total=token_colors_total,
             token_colors_gradations_total=token_colors_gradations_total,
             token_colors_min=token_colors_min,
@@ -1089,7 +1251,10 @@ def generate_themes(target_theme=None):
             workbench_base_color=workbench_base_color,
             workbench_editor_color=workbench_editor_color,
             workbench_editor_color_id=workbench_editor_color_id,
+            dump_palette_files=False,
         )
+    if palette_files is not None:
+        _dump_palette_files(*palette_files)
 
 
 def _generate_workbench_base_color(workbench_editor_color, workbench_base_color_rate):
@@ -1103,11 +1268,13 @@ def _generate_workbench_base_color(workbench_editor_color, workbench_base_color_
     return workbench_base_color
 
 
-def generate_random_theme():
+def generate_random_theme(target_theme=None):
     """
     Creates a random theme file with configuration options.
+
+    If the target theme is given (-t on the command line) or the option 'theme_name' is set, then the matched configured themes are generated instead.
     """
-    theme_name = config.options.get("theme_name")
+    theme_name = target_theme or config.options.get("theme_name")
     if theme_name:
         return generate_themes(theme_name)
     theme_mode = config.options.get("theme_mode")
@@ -1220,33 +1387,48 @@ def main():
         sys.argv[1:],
         "gp:rt:P:",
         [
-            "--random_theme",
-            "--generate",
-            "--print_colors=",
-            "--theme=",
-            "--print_palette=",
+            "random_theme",
+            "generate",
+            "print_colors=",
+            "theme=",
+            "print_palette=",
         ],
     )
+    # only collect the options here, then generate and print in a fixed order
+    to_generate_random_theme = False
     to_generate_themes = False
     to_print_colors = False
+    to_print_palette = False
     print_colors_filter = None
+    print_palette_filter = None
     target_theme = None
     for option, value in opts:
-        if option in ("-g", "--generate_default_themes"):
+        if option in ("-g", "--generate"):
             to_generate_themes = True
         if option in ("-r", "--random_theme"):
-            generate_random_theme()
+            to_generate_random_theme = True
         if option in ("-t", "--theme"):
             target_theme = value
         elif option in ("-p", "--print_colors"):
             to_print_colors = True
             print_colors_filter = value
         elif option in ("-P", "--print_palette"):
-            print_palette(value)
+            to_print_palette = True
+            print_palette_filter = value
+
+    # -r only generates the configured themes if a theme is targeted, and
+    # -g generates them already
+    if to_generate_random_theme and not (
+        to_generate_themes and (target_theme or config.options.get("theme_name"))
+    ):
+        generate_random_theme(target_theme)
 
     if to_generate_themes:
         generate_themes(target_theme)
 
+    if to_print_palette:
+        print_palette(print_palette_filter)
+
     if to_print_colors:
         print_colors(print_colors_filter, target_theme)
 